@@ -1,12 +1,22 @@
 import pandas as pd
 import os
-import re
+import contextlib
+import functools
+import hashlib
+import logging
+import logging.handlers
+import multiprocessing
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import FuzzyWordCompleter
-from datetime import datetime, timedelta
 
 DATA_FOLDER = "."  # Scan current folder
+CACHE_FOLDER = os.path.join(".cache", "full")  # Parquet copies of cleaned workbooks
+CACHE_VERSION = 4  # Bump when the cleaning logic changes
+
+logger = logging.getLogger(__name__)
+
 
 def scan_excel_files(folder_path):
     """
@@ -17,35 +27,113 @@ def scan_excel_files(folder_path):
         folder_path: Path to the folder (will be current folder ".").
 
     Returns:
-        A dictionary where keys are fund names and values are lists of available
-        months (strings like "November 2024"), sorted chronologically.
+        A dictionary where keys are fund names and values map the available
+        months (strings like "November 2024"), sorted chronologically, to the
+        path of the matching Excel file.
     """
-    fund_month_map = defaultdict(list)  # Changed value to list to maintain order
-    excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.xls'))]
+    # Rescan only when the folder itself changed (file added, removed or renamed)
+    mtime_ns = os.stat(folder_path).st_mtime_ns
+    fund_month_map = _scan_excel_files_cached(folder_path, mtime_ns)
+    return {fund: dict(month_paths) for fund, month_paths in fund_month_map.items()}
+
+
+@functools.lru_cache(maxsize=8)
+def _scan_excel_files_cached(folder_path, mtime_ns):
+    """Scans the folder; results are cached per (folder_path, mtime_ns)."""
+    fund_month_map = defaultdict(dict)  # dicts keep insertion (chronological) order
+    # scandir returns names, paths and file types from one directory read
+    with os.scandir(folder_path) as entries:
+        excel_files = [e for e in entries if e.name.endswith(('.xlsx', '.xls')) and e.is_file()]
+
+    parsed_files = []  # (fund name, month string, path)
+    for entry in excel_files:
+        file_name = entry.name
+        logger.debug(f"Processing: {file_name}")
+        # "<fund> - Monthly Portfolio <Month YYYY>.<ext>"; plain string splits, no regex needed
+        stem = file_name.rpartition('.')[0]
+        fund_code, separator, month_year_str = stem.rpartition(' - Monthly Portfolio ')
+        if separator:
+            parsed_files.append((fund_code, month_year_str.strip(), entry.path))
+
+    # Parse all month strings in one vectorized call, then sort every file at once
+    month_dates = pd.to_datetime([month_str for _, month_str, _ in parsed_files], format='%B %Y', errors='coerce')
+    for i in month_dates.argsort():
+        fund_name, month_year_str, path = parsed_files[i]
+        if pd.isna(month_dates[i]):
+            logger.warning(f"Could not parse month from filename: {os.path.basename(path)}")
+            continue
+        fund_month_map[fund_name][month_year_str] = path
 
-    for file_name in excel_files:
-        print(f"Processing: {file_name}")
-        match = re.match(r"([A-Za-z0-9\s\-\_]+) - Monthly Portfolio ([A-Za-z]+ \d{4})\.(xlsx|xls)", file_name)
-        if match:
-            fund_code = match.group(1)
-            month_year_str = match.group(2).strip()
-            fund_name = fund_code
+    return fund_month_map
 
-            try:
-                month_date = datetime.strptime(month_year_str, '%B %Y') # Parse month string to datetime
-                fund_month_map[fund_name].append((month_date, month_year_str)) # Store datetime and string
-            except ValueError:
-                print(f"Warning: Could not parse month from filename: {file_name}")
 
-    # Sort months chronologically for each fund and keep only month strings
-    for fund in fund_month_map:
-        fund_month_map[fund].sort(key=lambda item: item[0]) # Sort based on datetime
-        fund_month_map[fund] = [month_str for _, month_str in fund_month_map[fund]] # Keep only month strings
+def cache_path_for(file_path, mtime_ns=None):
+    """
+    Returns the Parquet cache path for file_path; it changes whenever the file is modified.
+    The file is only stat'ed when its mtime_ns is not passed in.
+    """
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+    if mtime_ns is None:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    return os.path.join(CACHE_FOLDER, f"{digest}_v{CACHE_VERSION}_{mtime_ns}.parquet")
 
-    return fund_month_map
+
+def read_cache(cache_path):
+    """Returns the cached frame at cache_path, or None if there is no usable entry."""
+    try:
+        return pd.read_parquet(cache_path, engine="pyarrow")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+
+def write_cache(df, cache_path):
+    """Writes df to cache_path, dropping cache files left over from older versions of the workbook."""
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        prefix = os.path.basename(cache_path).split('_', 1)[0] + '_'
+        with os.scandir(CACHE_FOLDER) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix):
+                    os.remove(entry.path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, engine="pyarrow")
+        os.replace(tmp_path, cache_path)  # Never leave a half-written cache file behind
+    except Exception as e:
+        logger.warning(f"Could not write cache {cache_path}: {e}")
+
+
+def compact_quantity(quantity):
+    """Converts quantities to nullable Int32 when they are whole numbers that fit, else float64."""
+    quantity = pd.to_numeric(quantity, errors='coerce')
+    valid = quantity.dropna()
+    if (valid % 1 == 0).all() and (valid.abs() < 2**31).all():
+        return quantity.astype('Int32')
+    return quantity
+
+
+def prefetch_files(file_paths):
+    """
+    Hints the OS to read files into the page cache in the background
+    (posix_fadvise WILLNEED), so disk reads overlap with parsing.
+    Callers pass only the files that are not served from the cache.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            continue  # Only a hint; the loader reports real errors
 
 
-def load_and_clean_excel_data(file_path, fund_name, month_str):
+def load_and_clean_excel_data(file_path, fund_name, month_str, mtime_ns=None, use_cache=True):
     """
     Loads data from a single Excel file, cleans it, and returns a Pandas DataFrame.
     Applies ISIN cleaning and sets ISIN as index.
@@ -54,72 +142,154 @@ def load_and_clean_excel_data(file_path, fund_name, month_str):
         file_path: Path to the Excel file.
         fund_name: Name of the fund.
         month_str: Month string.
+        mtime_ns: The file's modification time, if the caller already has it.
+        use_cache: Whether to look for a cached copy first (the result is cached either way).
 
     Returns:
         A cleaned Pandas DataFrame, or None if loading fails.
     """
     try:
-        df = pd.read_excel(file_path, header=None)
-        header_row_index = None
-        for index, row in df.iterrows():
-            if "Name of the Instrument" in row.values:
-                header_row_index = index
-                break
+        # Cached frames already carry the Fund Name / Month tags
+        cache_path = cache_path_for(file_path, mtime_ns)
+        if use_cache:
+            cached_df = read_cache(cache_path)
+            if cached_df is not None:
+                return cached_df
+
+        df_raw = pd.read_excel(file_path, header=None, engine="calamine")
+        # Compare on the raw ndarray; no intermediate boolean DataFrame
+        is_header = (df_raw.to_numpy() == "Name of the Instrument").any(axis=1)
+        header_row_index = int(is_header.argmax()) if is_header.any() else None
 
         if header_row_index is None:
-            print(f"Warning: Header row not found in {file_path}. Skipping.")
+            logger.warning(f"Header row not found in {file_path}. Skipping.")
             return None
 
-        df = pd.read_excel(file_path, header=header_row_index)
-        df.columns = [str(col).strip() for col in df.columns]
-
         required_cols = ["Name of the Instrument", "ISIN", "Rating / Industry^", "Quantity"]
+
+        # Reuse the sheet already in memory instead of reading it a second time,
+        # and only carry the required columns forward
+        header = df_raw.iloc[header_row_index].astype(str).str.strip()
+        keep = header.isin(required_cols).to_numpy()
+        df = df_raw.iloc[header_row_index + 1:, keep].reset_index(drop=True).infer_objects()
+        df.columns = header[keep].tolist()
+
         for col in required_cols:
             if col not in df.columns:
                 df[col] = None
 
-        df_cleaned = df[required_cols].copy()
-        df_cleaned.rename(columns={
+        # Arrow-backed strings make the .str calls below vectorized C++ kernels
+        for col in ["Name of the Instrument", "ISIN", "Rating / Industry^"]:
+            df[col] = df[col].astype('string[pyarrow]')
+
+        df_cleaned = df[required_cols].rename(columns={
             "Name of the Instrument": "Instrument Name",
             "Rating / Industry^": "Rating / Industry"
-        }, inplace=True)
+        })
+        del df, df_raw  # Release the full sheet before filtering
+
+        # One combined mask keeps rows with a non-blank instrument name and an
+        # 'INE' ISIN (na=False also drops missing ISINs), so only one filtered copy is made
+        isin = df_cleaned['ISIN']
+        has_name = df_cleaned['Instrument Name'].str.strip().ne('').fillna(False)
+        mask = has_name & isin.str.startswith('INE', na=False)
+        df_cleaned = df_cleaned.loc[mask]
+        df_cleaned.index = pd.Index(isin[mask].values, name='ISIN') # Set ISIN as index
+        df_cleaned = df_cleaned.drop(columns='ISIN')
 
         df_cleaned['Fund Name'] = fund_name
         df_cleaned['Month'] = month_str
 
-        df_cleaned.dropna(subset=['Instrument Name'], inplace=True)
-        df_cleaned = df_cleaned[df_cleaned['Instrument Name'].str.strip() != '']
-
-        # --- ISIN Cleaning ---
-        df_cleaned = df_cleaned[df_cleaned['ISIN'].notna()]
-        df_cleaned['ISIN'] = df_cleaned['ISIN'].astype(str)
-        df_cleaned = df_cleaned[df_cleaned['ISIN'].str.startswith('INE')]
-        df_cleaned = df_cleaned.dropna(axis=1, how='all') # Drop cols with all NaN
-
-        df_cleaned = df_cleaned.set_index('ISIN') # Set ISIN as index
+        # Compact dtypes: repeated strings become categories, quantities 32-bit integers.
+        # Float32 is avoided because it cannot hold share counts above 2**24 exactly.
+        for col in ['Rating / Industry', 'Fund Name', 'Month']:
+            df_cleaned[col] = df_cleaned[col].astype('category')
+        df_cleaned['Quantity'] = compact_quantity(df_cleaned['Quantity'])
 
+        write_cache(df_cleaned, cache_path)
         return df_cleaned
 
+    except FileNotFoundError:
+        logger.warning(f"File not found for {fund_name}, {month_str}: {file_path}")
+        return None
     except Exception as e:
-        print(f"Error loading/processing {file_path}: {e}")
+        logger.error(f"Error loading/processing {file_path}: {e}")
         return None
 
 
-def load_data_for_fund_months(folder_path, fund_name, month_strings):
+def init_worker_logging(log_queue, level):
+    """Routes a worker process's log records through the parent's queue."""
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+@contextlib.contextmanager
+def worker_log_queue():
+    """Yields a queue for worker log records; a listener emits them through the root handlers."""
+    log_queue = multiprocessing.Queue()
+    handlers = logging.getLogger().handlers or [logging.lastResort]
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+        log_queue.join_thread()
+
+
+def load_data_for_fund_months(folder_path, fund_name, month_strings, month_paths=None):
     """
     Loads data for a specific fund and list of months.
+
+    month_paths optionally maps month strings to the file paths found by
+    scan_excel_files; other months are looked up in folder_path.
     """
-    monthly_data = {}
+    month_paths = month_paths or {}
+    loaded = {}
+    to_parse = {}
     for month_str in month_strings:
-        file_name = f"{fund_name} - Monthly Portfolio {month_str}.xlsx"
-        file_path = os.path.join(folder_path, file_name)
-        if os.path.exists(file_path):
-            monthly_df = load_and_clean_excel_data(file_path, fund_name, month_str)
-            if monthly_df is not None:
-                monthly_data[month_str] = monthly_df
+        if month_str in month_paths:
+            file_path = month_paths[month_str]
         else:
-            print(f"Warning: File not found for {fund_name}, {month_str}: {file_path}")
+            file_name = f"{fund_name} - Monthly Portfolio {month_str}.xlsx"
+            file_path = os.path.join(folder_path, file_name)
 
+        # Stat each workbook once; its mtime keys the cache here and in the worker
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            logger.warning(f"File not found for {fund_name}, {month_str}: {file_path}")
+            continue
+
+        cached_df = read_cache(cache_path_for(file_path, mtime_ns))
+        if cached_df is not None:
+            loaded[month_str] = cached_df
+        else:
+            to_parse[month_str] = (file_path, mtime_ns)
+
+    # Only workbooks without a cache entry need a worker, so fully cached
+    # selections never start the pool
+    if to_parse:
+        prefetch_files(file_path for file_path, _ in to_parse.values())
+        # Each workbook is parsed independently, so spread them across cores
+        max_workers = min(len(to_parse), os.cpu_count() or 1)
+        with worker_log_queue() as log_queue, \
+                ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker_logging,
+                                    initargs=(log_queue, logger.getEffectiveLevel())) as executor:
+            futures = {
+                month_str: executor.submit(load_and_clean_excel_data, file_path, fund_name, month_str,
+                                           mtime_ns, False)
+                for month_str, (file_path, mtime_ns) in to_parse.items()
+            }
+            for month_str, future in futures.items():
+                monthly_df = future.result()
+                if monthly_df is not None:
+                    loaded[month_str] = monthly_df
+
+    # Keep the requested month order whether a frame came from the cache or a worker
+    monthly_data = {month_str: loaded[month_str] for month_str in month_strings if month_str in loaded}
     if not monthly_data:
         return None
     return monthly_data
@@ -132,20 +302,20 @@ def create_consolidated_dataframe(monthly_data_dict):
     if not monthly_data_dict:
         return None
 
-    consolidated_df = None
-    for month_str, df in monthly_data_dict.items():
-        df_month_pivot = df.pivot_table(
-            index=['ISIN', 'Instrument Name', 'Rating / Industry', 'Fund Name'],
-            values='Quantity',
-            aggfunc='first'
-        ).rename(columns={'Quantity': f'Quantity {month_str}'}).reset_index()
-
-        if consolidated_df is None:
-            consolidated_df = df_month_pivot
-        else:
-            consolidated_df = pd.merge(consolidated_df, df_month_pivot,
-                                       on=['ISIN', 'Instrument Name', 'Rating / Industry', 'Fund Name'],
-                                       how='outer')
+    # Align every month's quantities on the shared keys in a single concat
+    # instead of growing the frame with one outer merge per month
+    # An ISIN listed twice in one file keeps its first row, as pivot_table's
+    # aggfunc='first' did; concat needs unique keys to align the months
+    key_cols = ['Instrument Name', 'Rating / Industry', 'Fund Name']
+    quantities = {
+        month_str: df[~df.index.duplicated(keep='first')].set_index(key_cols, append=True)['Quantity']
+        for month_str, df in monthly_data_dict.items()
+    }
+    consolidated_df = (
+        pd.concat(quantities, axis=1, sort=True)
+        .rename(columns=lambda month_str: f'Quantity {month_str}')
+        .reset_index()
+    )
     return consolidated_df
 
 
@@ -254,7 +424,7 @@ def main():
         print("Exiting.")
         return
 
-    available_months_for_fund = fund_month_map[selected_fund_name]
+    available_months_for_fund = list(fund_month_map[selected_fund_name])
     if not available_months_for_fund:
         print(f"No monthly data available for fund: {selected_fund_name}")
         return
@@ -276,7 +446,8 @@ def main():
         print(f"Date Range Parameters: {date_range_params}")
     print(f"Selected Months: {selected_month_strings}")
 
-    monthly_data = load_data_for_fund_months(DATA_FOLDER, selected_fund_name, selected_month_strings)
+    monthly_data = load_data_for_fund_months(DATA_FOLDER, selected_fund_name, selected_month_strings,
+                                             fund_month_map[selected_fund_name])
     if not monthly_data:
         print("No data loaded for selected months. Check data files.")
         return
@@ -296,4 +467,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
\ No newline at end of file
@@ -47,9 +47,16 @@ def load_and_process_data(fund_name, month_str):
         print(f"An unexpected error occurred while loading {filename}: {e}")
         return None
 
+def coalesce_columns(df, base_columns):
+    """Collapses each group of suffixed base columns into one, taking the first non-null value."""
+    coalesced = {col: df.filter(like=col).bfill(axis=1).iloc[:, 0] for col in base_columns}
+    suffixed = [c for c in df.columns if c.startswith(tuple(base_columns))]
+    return pd.concat([pd.DataFrame(coalesced), df.drop(columns=suffixed)], axis=1)
+
 # Example Usage
 portfolio_data = scan_full_folder()
-all_data = pd.DataFrame(columns=['Name of the Instrument', 'Rating / Industry']) # Initialize with common columns
+base_columns = ['Name of the Instrument', 'Rating / Industry^']
+all_data = pd.DataFrame(columns=base_columns) # Initialize with common columns
 
 if portfolio_data:
     print("Portfolio Data Map:")
@@ -60,6 +67,8 @@ if portfolio_data:
         for month in months:
             df = load_and_process_data(fund, month)
             if df is not None:
+                # Suffix the shared columns so merges never collide; they are coalesced once after the loop
+                df = df.rename(columns={col: f'{col} {fund} {month}' for col in base_columns})
                 # Merge, keeping existing columns and adding new month columns
                 if all_data.empty:
                     all_data=df
@@ -69,6 +78,7 @@ if portfolio_data:
                 print(f"Failed to load data for {fund} - {month}")
 
     if not all_data.empty:
+        all_data = coalesce_columns(all_data, base_columns)
         print("\nCombined Data:")
         print(all_data)
         print(all_data.info())
@@ -1,11 +1,20 @@
-import difflib
+import numpy as np
+from rapidfuzz import fuzz, process
 
-def suggest_fund(user_input, fund_names):
+
+def fund_name_arrays(fund_names):
+    """Returns (lower-cased names, original names) as numpy arrays for the substring fallback."""
+    return np.array([name.lower() for name in fund_names], dtype=str), np.array(fund_names, dtype=object)
+
+
+def suggest_fund(user_input, fund_names, name_arrays=None):
     """Suggests fund names based on user input using fuzzy matching.
 
     Args:
         user_input: The user's input string.
         fund_names: A list of available fund names.
+        name_arrays: Optional result of fund_name_arrays(fund_names), built once by
+            callers that look up the same list repeatedly.
 
     Returns:
         A list of suggested fund names, sorted by similarity, or an empty list if no good matches are found.
@@ -14,21 +23,29 @@ def suggest_fund(user_input, fund_names):
     if not user_input:  # Handle empty input
         return []
 
-    # Use difflib.get_close_matches for efficient fuzzy matching
-    suggestions = difflib.get_close_matches(user_input, fund_names, n=5, cutoff=0.6) #n=max suggestions, cutoff=similarity threshold
+    # Use RapidFuzz for fuzzy matching; scoring runs in C++ over the whole list.
+    # fuzz.ratio without a processor mirrors difflib's case-sensitive ratio, so
+    # score_cutoff=60 keeps the old cutoff=0.6 behaviour
+    matches = process.extract(user_input, fund_names, scorer=fuzz.ratio,
+                              limit=5, score_cutoff=60) #limit=max suggestions, score_cutoff=similarity threshold (0-100)
+    suggestions = [name for name, score, index in matches]
 
     if not suggestions: #if no close matches, try contains search
-        suggestions = [fund for fund in fund_names if user_input.lower() in fund.lower()]
-        suggestions.sort(key=lambda x: x.lower().find(user_input.lower())) #sort by index of match
+        lower_names, names = name_arrays if name_arrays is not None else fund_name_arrays(fund_names)
+        positions = np.char.find(lower_names, user_input.lower()) #-1 where there is no match
+        matched = np.flatnonzero(positions >= 0)
+        order = np.argsort(positions[matched], kind='stable') #sort by index of match
+        suggestions = names[matched[order]].tolist()
 
     return suggestions
 
 
 def get_fund_input(fund_names):
     """Gets user input for a fund name with auto-completion suggestions."""
+    name_arrays = fund_name_arrays(fund_names) # Built once for every lookup in the loop
     while True:
         user_input = input("Enter Mutual Fund Name: ")
-        suggestions = suggest_fund(user_input, fund_names)
+        suggestions = suggest_fund(user_input, fund_names, name_arrays)
 
         if suggestions:
             print("Did you mean:")
@@ -1,5 +1,5 @@
 import curses
-from thefuzz import process
+from rapidfuzz import process, utils
 
 def main(stdscr):
     stdscr.clear()
@@ -37,7 +37,7 @@ def main(stdscr):
             except ValueError:
                 pass #ignore non-printable characters
 
-        suggestions = process.extract(query, data )
+        suggestions = process.extract(query, data, processor=utils.default_process)
         suggestions = [s[0] for s in suggestions]
 
 if __name__ == "__main__":
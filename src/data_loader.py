@@ -1,9 +1,53 @@
 import os
+import contextlib
+import functools
+import hashlib
+import logging
+import logging.handlers
+import multiprocessing
 import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Optional
 
-def scan_excel_files(data_dir: str = "data") -> Dict[str, List[str]]:
+logger = logging.getLogger(__name__)
+
+# Columns used by the analysis; everything else in the sheet is ignored
+REQUIRED_COLUMNS = ['ISIN', 'Name of the Instrument', 'Rating / Industry^', 'Quantity', '% to NAV']
+
+# Cleaned and consolidated DataFrames are cached here as Parquet, keyed by source
+# paths and mtimes. Bump CACHE_VERSION whenever the cleaning or consolidation
+# logic changes its output.
+CACHE_DIR = ".cache"
+CACHE_VERSION = 5
+
+# Month numbers keyed by lower-cased month name; lookups casefold the name so
+# "september 2024" sorts like "September 2024", as strptime('%B %Y') allows
+MONTH_NUM = {
+    name.lower(): number for number, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+         'August', 'September', 'October', 'November', 'December'], start=1)
+}
+
+def month_sort_key(month_str: str) -> int:
+    """
+    Chronological sort key for a "Month Year" string.
+    
+    Args:
+        month_str (str): Month in format "Month Year"
+        
+    Returns:
+        int: Months since year 0, so plain integer comparison sorts chronologically
+        
+    Raises:
+        ValueError: If the string is not a valid "Month Year"
+    """
+    month_name, _, year = month_str.partition(' ')
+    month_number = MONTH_NUM.get(month_name.lower())
+    if month_number is None:
+        raise ValueError(f"Invalid month: {month_str!r}")
+    return int(year) * 12 + month_number
+
+def scan_excel_files(data_dir: str = "data") -> Dict[str, Dict[str, str]]:
     """
     Scan the data directory for Excel files and create a map of fund names to their available months.
     
@@ -11,87 +55,206 @@ def scan_excel_files(data_dir: str = "data") -> Dict[str, List[str]]:
         data_dir (str): Directory containing the Excel files
         
     Returns:
-        Dict[str, List[str]]: Map of fund names to sorted list of available months
+        Dict[str, Dict[str, str]]: Map of fund names to their available months (in
+            chronological order), each mapped to the path of its Excel file
+    """
+    try:
+        mtime_ns = os.stat(data_dir).st_mtime_ns
+        # The directory mtime changes whenever a file is added, removed or renamed,
+        # so an unchanged mtime means the cached scan is still valid. Errors are
+        # raised out of the cached helper so a failed scan is never cached.
+        fund_month_map = _scan_excel_files_cached(data_dir, mtime_ns)
+    except Exception as e:
+        logger.error(f"Error scanning directory {data_dir}: {str(e)}")
+        return {}
+    
+    return {fund: dict(month_paths) for fund, month_paths in fund_month_map.items()}
+
+@functools.lru_cache(maxsize=8)
+def _scan_excel_files_cached(data_dir: str, mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """
+    Scan the data directory once per directory modification time.
+    
+    Args:
+        data_dir (str): Directory containing the Excel files
+        mtime_ns (int): Modification time of the directory, used as cache key
+        
+    Returns:
+        Dict[str, Dict[str, str]]: Map of fund names to their available months (in
+            chronological order), each mapped to the path of its Excel file
+    
+    Raises:
+        OSError: If the directory cannot be read
     """
+    files = []
     fund_month_map = {}
     
-    try:
-        for filename in os.listdir(data_dir):
-            if filename.endswith(('.xlsx', '.xls')):
-                try:
-                    # Expected format: "ZN250 - Monthly Portfolio September 2024.xlsx"
-                    parts = filename.split(' - Monthly Portfolio ')
-                    if len(parts) != 2:
-                        continue
-                        
-                    fund_name = parts[0].strip()
-                    date_str = parts[1].replace('.xlsx', '').replace('.xls', '').strip()
-                    
-                    if fund_name not in fund_month_map:
-                        fund_month_map[fund_name] = []
-                    fund_month_map[fund_name].append(date_str)
-                
-                except (IndexError, ValueError) as e:
-                    print(f"Warning: Could not parse filename {filename}: {str(e)}")
+    # scandir yields name, path and file type from a single directory read
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if not (entry.name.endswith(('.xlsx', '.xls')) and entry.is_file()):
+                continue
+            try:
+                # Expected format: "ZN250 - Monthly Portfolio September 2024.xlsx"
+                parts = entry.name.split(' - Monthly Portfolio ')
+                if len(parts) != 2:
                     continue
+                    
+                fund_name = parts[0].strip()
+                date_str = parts[1].replace('.xlsx', '').replace('.xls', '').strip()
+                files.append((fund_name, date_str, entry.path))
+            
+            except (IndexError, ValueError) as e:
+                logger.warning(f"Could not parse filename {entry.name}: {str(e)}")
+                continue
+    
+    # Parse every month in one vectorized call and sort all files once;
+    # inserting in that order keeps each fund's months chronological
+    dates = pd.to_datetime([date_str for _, date_str, _ in files], format='%B %Y', errors='coerce')
+    for i in dates.argsort():
+        fund_name, date_str, path = files[i]
+        if pd.isna(dates[i]):
+            logger.warning(f"Could not parse month '{date_str}' in {path}")
+            continue
+        fund_month_map.setdefault(fund_name, {})[date_str] = path
+    
+    return fund_month_map
+
+def _cache_path(file_path: str, mtime_ns: Optional[int] = None) -> str:
+    """
+    Get the Parquet cache path for an Excel file.
+    
+    Args:
+        file_path (str): Path to the Excel file
+        mtime_ns (Optional[int]): File modification time if already known; the
+            file is stat'ed only when it is not given
         
-        # Sort months chronologically for each fund
-        for fund in fund_month_map:
-            fund_month_map[fund].sort(key=lambda x: datetime.strptime(x, '%B %Y'))
+    Returns:
+        str: Cache path, which changes whenever the file is modified
+    """
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+    if mtime_ns is None:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    return os.path.join(CACHE_DIR, f"{digest}_v{CACHE_VERSION}_{mtime_ns}.parquet")
+
+def _read_cache(cache_path: str) -> Optional[pd.DataFrame]:
+    """
+    Read a cached DataFrame.
+    
+    Args:
+        cache_path (str): Path returned by _cache_path
         
+    Returns:
+        Optional[pd.DataFrame]: Cached DataFrame or None on a cache miss
+    """
+    try:
+        return pd.read_parquet(cache_path, engine="pyarrow", dtype_backend="pyarrow")
+    except FileNotFoundError:
+        return None
     except Exception as e:
-        print(f"Error scanning directory {data_dir}: {str(e)}")
+        logger.warning(f"Ignoring unreadable cache file {cache_path}: {str(e)}")
+        return None
+
+def _write_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """
+    Write a DataFrame to the cache, removing stale entries for the same file.
     
-    return fund_month_map
+    Args:
+        df (pd.DataFrame): Cleaned DataFrame
+        cache_path (str): Path returned by _cache_path
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        prefix = os.path.basename(cache_path).split('_', 1)[0] + '_'
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix):
+                    os.remove(entry.path)
+        
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write cache file {cache_path}: {str(e)}")
 
-def load_and_clean_excel_data(file_path: str) -> Optional[pd.DataFrame]:
+def _prefetch_files(file_paths: List[str]) -> None:
+    """
+    Ask the OS to start reading files into the page cache ahead of parsing.
+    
+    posix_fadvise(WILLNEED) returns immediately while the kernel reads ahead in
+    the background, so disk latency for later files overlaps parsing of earlier ones.
+    
+    Args:
+        file_paths (List[str]): Paths of the Excel files about to be parsed (callers
+            leave out files served from the Parquet cache)
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Prefetching is only a hint; the loader reports real errors
+            continue
+
+def load_and_clean_excel_data(file_path: str, mtime_ns: Optional[int] = None,
+                              use_cache: bool = True) -> Optional[pd.DataFrame]:
     """
     Load and clean data from an Excel file.
     
     Args:
         file_path (str): Path to the Excel file
+        mtime_ns (Optional[int]): File modification time if already known
+        use_cache (bool): Look for a cached copy first; callers that already
+            missed the cache pass False (the result is cached either way)
         
     Returns:
         Optional[pd.DataFrame]: Cleaned DataFrame or None if loading fails
     """
     try:
-        # First read without headers to find the header row
-        df_raw = pd.read_excel(file_path, header=None)
+        # Reuse the cleaned data from a previous run if the file is unchanged
+        cache_path = _cache_path(file_path, mtime_ns)
+        if use_cache:
+            df = _read_cache(cache_path)
+            if df is not None:
+                logger.info(f"Loaded cached data for {file_path}")
+                return df
         
-        # Find the header row by looking for 'ISIN'
-        header_row = None
-        for idx, row in df_raw.iterrows():
-            if 'ISIN' in row.values:
-                header_row = idx
-                break
+        # Read the sheet once without headers; the header row is located in memory
+        df_raw = pd.read_excel(file_path, header=None, engine="calamine")
+        
+        # Find the header row by looking for 'ISIN', comparing on the raw ndarray
+        # rather than building an intermediate boolean DataFrame
+        is_header = (df_raw.to_numpy() == 'ISIN').any(axis=1)
+        header_row = int(is_header.argmax()) if is_header.any() else None
         
         if header_row is None:
-            print(f"\nCould not find header row in {file_path}")
+            logger.error(f"Could not find header row in {file_path}")
             return None
             
-        # Now read the file again with the correct header row
-        df = pd.read_excel(file_path, skiprows=header_row)
-        
-        # Clean column names (remove extra whitespace and handle unnamed columns)
-        df.columns = [str(col).strip() for col in df.columns]
+        # Promote the header row to column names instead of parsing the file again,
+        # keeping only the required columns so the rest are never processed
+        header = df_raw.iloc[header_row].astype(str).str.strip()
+        keep = header.isin(REQUIRED_COLUMNS).to_numpy()
+        df = df_raw.iloc[header_row + 1:, keep].reset_index(drop=True).infer_objects()
+        df.columns = header[keep].tolist()
         
-        # Rename unnamed columns if they exist
-        rename_map = {}
-        for col in df.columns:
-            if col.startswith('Unnamed:'):
-                rename_map[col] = None
-        if rename_map:
-            df = df.rename(columns=rename_map)
-            df = df.drop(columns=[col for col in df.columns if col is None])
-        
-        print(f"\nFound columns in {file_path}:")
-        print(df.columns.tolist())
+        # Arrow-backed strings run the .str methods below as vectorized kernels
+        for col in ('ISIN', 'Name of the Instrument', 'Rating / Industry^'):
+            if col in df.columns:
+                df[col] = df[col].astype('string[pyarrow]')
         
-        # Drop rows where ISIN is missing or empty
-        df = df.dropna(subset=['ISIN'])
+        logger.debug(f"Found columns in {file_path}: {df.columns.tolist()}")
         
-        # Drop rows that are section headers or have no data
-        df = df[df['ISIN'].str.startswith('INE', na=False)]
+        # Keep only security rows: a single mask over the ISIN column drops
+        # section headers as well as rows where ISIN is missing or empty
+        df = df.loc[df['ISIN'].str.startswith('INE', na=False)]
         
         # Convert numeric columns
         numeric_cols = ['Quantity', '% to NAV']
@@ -99,23 +262,166 @@ def load_and_clean_excel_data(file_path: str) -> Optional[pd.DataFrame]:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
+        # Arrow-backed dtypes throughout (strings and nullable numbers) keep
+        # consolidation and lookups in Arrow's C++ kernels; converting before
+        # set_index gives the ISIN index the same dtype it has when read back from cache
+        df = df.convert_dtypes(dtype_backend='pyarrow')
+        
         # Set ISIN as index
         df.set_index('ISIN', inplace=True)
+        # NAV shares are fractions that float32 holds to ~7 significant digits;
+        # quantities stay 64-bit so changes in share counts remain exact
+        if '% to NAV' in df.columns:
+            df['% to NAV'] = df['% to NAV'].astype('float32[pyarrow]')
         
-        print(f"\nSuccessfully loaded data from {file_path}")
-        print(f"Found {len(df)} valid entries")
-        print("\nSample of loaded data:")
-        # print(df.head())
+        logger.info(f"Successfully loaded data from {file_path}")
+        logger.info(f"Found {len(df)} valid entries")
+        logger.debug(f"Sample of loaded data:\n{df.head()}")
         
+        _write_cache(df, cache_path)
         return df
         
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+        return None
+        
     except Exception as e:
-        print(f"\nError loading file {file_path}: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception(f"Error loading file {file_path}: {str(e)}")
+        return None
+
+def _init_worker_logging(log_queue: multiprocessing.Queue, level: int) -> None:
+    """
+    Route a worker process's log records to the parent through a queue.
+    
+    Args:
+        log_queue (multiprocessing.Queue): Queue drained by the parent's QueueListener
+        level (int): Logging level of the parent's data_loader logger
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+
+@contextlib.contextmanager
+def _worker_log_queue() -> Iterator[multiprocessing.Queue]:
+    """
+    Provide a queue for worker log records, drained into this process's root handlers.
+    
+    A QueueListener thread hands each record to the root logger's handlers (or
+    logging's last-resort handler when none are configured), honouring each
+    handler's level. The queue is closed and its feeder thread joined on exit.
+    
+    Yields:
+        multiprocessing.Queue: Queue to pass to _init_worker_logging
+    """
+    log_queue = multiprocessing.Queue()
+    handlers = logging.getLogger().handlers or [logging.lastResort]
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+        log_queue.join_thread()
+
+def resolve_month_files(fund_name: str, months: List[str], data_dir: str = "data",
+                        file_paths: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, Optional[int]]]:
+    """
+    Map each month to the Excel file it is loaded from and that file's modification time.
+    
+    Each file is stat'ed here once; the caches and the loader reuse the result.
+    
+    Args:
+        fund_name (str): Name of the fund
+        months (List[str]): List of months
+        data_dir (str): Directory containing the data files
+        file_paths (Optional[Dict[str, str]]): Map of months to file paths as returned by
+            scan_excel_files; months missing from it are looked up in data_dir
+        
+    Returns:
+        Dict[str, Tuple[str, Optional[int]]]: Map of months to (file path, mtime in
+            nanoseconds), with None as the mtime for files that do not exist
+    """
+    file_paths = file_paths or {}
+    month_files = {}
+    
+    for month in months:
+        if month in file_paths:
+            file_path = file_paths[month]
+        else:
+            # Updated file pattern to match actual format
+            file_pattern = f"{fund_name} - Monthly Portfolio {month}.xlsx"
+            file_path = os.path.join(data_dir, file_pattern)
+        
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        month_files[month] = (file_path, mtime_ns)
+    
+    return month_files
+
+def _consolidated_cache_path(fund_name: str, months: List[str],
+                             month_files: Dict[str, Tuple[str, Optional[int]]]) -> Optional[str]:
+    """
+    Get the Parquet cache path for the consolidated DataFrame of a fund and months.
+    
+    The name starts with a hash of the fund and months, so _write_cache replaces
+    older entries for the same selection, followed by a hash of every source
+    file's modification time, so editing any workbook invalidates the entry.
+    
+    Returns:
+        Optional[str]: Cache path, or None if a source file is missing
+    """
+    mtimes = [mtime_ns for _, mtime_ns in month_files.values()]
+    if None in mtimes:
         return None
+    
+    selection = hashlib.md5(f"{fund_name}|{'|'.join(months)}".encode()).hexdigest()
+    sources = hashlib.md5('|'.join(map(str, mtimes)).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{selection}_v{CACHE_VERSION}_{sources}.parquet")
 
-def load_data_for_fund_months(fund_name: str, months: List[str], data_dir: str = "data") -> Dict[str, pd.DataFrame]:
+def read_consolidated_cache(fund_name: str, months: List[str],
+                            month_files: Dict[str, Tuple[str, Optional[int]]]) -> Optional[pd.DataFrame]:
+    """
+    Read the cached consolidated DataFrame for a fund and months.
+    
+    Args:
+        fund_name (str): Name of the fund
+        months (List[str]): List of months
+        month_files (Dict[str, Tuple[str, Optional[int]]]): Output of resolve_month_files
+        
+    Returns:
+        Optional[pd.DataFrame]: Cached consolidated DataFrame, or None on a cache miss
+    """
+    cache_path = _consolidated_cache_path(fund_name, months, month_files)
+    if cache_path is None:
+        return None
+    
+    consolidated_df = _read_cache(cache_path)
+    if consolidated_df is not None:
+        logger.info(f"Loaded cached consolidated data for {fund_name}")
+    return consolidated_df
+
+def write_consolidated_cache(consolidated_df: pd.DataFrame, fund_name: str, months: List[str],
+                             month_files: Dict[str, Tuple[str, Optional[int]]]) -> None:
+    """
+    Cache the consolidated DataFrame for a fund and months.
+    
+    Args:
+        consolidated_df (pd.DataFrame): Output of create_consolidated_dataframe
+        fund_name (str): Name of the fund
+        months (List[str]): List of months
+        month_files (Dict[str, Tuple[str, Optional[int]]]): Output of resolve_month_files
+    """
+    cache_path = _consolidated_cache_path(fund_name, months, month_files)
+    if cache_path is not None:
+        _write_cache(consolidated_df, cache_path)
+
+def load_data_for_fund_months(fund_name: str, months: List[str], data_dir: str = "data",
+                              file_paths: Optional[Dict[str, str]] = None,
+                              month_files: Optional[Dict[str, Tuple[str, Optional[int]]]] = None
+                              ) -> Dict[str, pd.DataFrame]:
     """
     Load data for specified fund and months.
     
@@ -123,27 +429,52 @@ def load_data_for_fund_months(fund_name: str, months: List[str], data_dir: str =
         fund_name (str): Name of the fund
         months (List[str]): List of months to load
         data_dir (str): Directory containing the data files
+        file_paths (Optional[Dict[str, str]]): Map of months to file paths as returned by
+            scan_excel_files; months missing from it are looked up in data_dir
+        month_files (Optional[Dict[str, Tuple[str, Optional[int]]]]): Output of
+            resolve_month_files, when the caller has already resolved the files
         
     Returns:
         Dict[str, pd.DataFrame]: Map of months to their corresponding DataFrames
     """
-    monthly_data = {}
+    if month_files is None:
+        month_files = resolve_month_files(fund_name, months, data_dir, file_paths)
     
-    for month in months:
-        # Updated file pattern to match actual format
-        file_pattern = f"{fund_name} - Monthly Portfolio {month}.xlsx"
-        file_path = os.path.join(data_dir, file_pattern)
-        
-        print(f"Looking for file: {file_path}")
-        if os.path.exists(file_path):
-            print(f"Found file: {file_path}")
-            df = load_and_clean_excel_data(file_path)
-            if df is not None:
-                monthly_data[month] = df
+    # Serve cache hits directly; only workbooks without a cached copy are parsed
+    loaded = {}
+    to_parse = {}
+    for month, (file_path, mtime_ns) in month_files.items():
+        if mtime_ns is None:
+            logger.error(f"File not found: {file_path}")
+            continue
+        
+        df = _read_cache(_cache_path(file_path, mtime_ns))
+        if df is not None:
+            logger.info(f"Loaded cached data for {file_path}")
+            loaded[month] = df
         else:
-            print(f"File not found: {file_path}")
+            to_parse[month] = (file_path, mtime_ns)
+    
+    if to_parse:
+        _prefetch_files([file_path for file_path, _ in to_parse.values()])
+        
+        # Workbooks are independent of each other, so parse them on separate cores
+        max_workers = min(len(to_parse), os.cpu_count() or 1)
+        with _worker_log_queue() as log_queue, \
+                ProcessPoolExecutor(max_workers=max_workers,
+                                    initializer=_init_worker_logging,
+                                    initargs=(log_queue, logger.getEffectiveLevel())) as executor:
+            futures = {
+                month: executor.submit(load_and_clean_excel_data, file_path, mtime_ns, False)
+                for month, (file_path, mtime_ns) in to_parse.items()
+            }
+            for month, future in futures.items():
+                df = future.result()
+                if df is not None:
+                    loaded[month] = df
     
-    return monthly_data 
+    # Keep the requested month order regardless of where each frame came from
+    return {month: loaded[month] for month in month_files if month in loaded}
 
 # df = load_and_clean_excel_data("data/ZN250 - Monthly Portfolio September 2024.xlsx") 
 
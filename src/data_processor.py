@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
-from datetime import datetime
+
+from data_loader import month_sort_key
 
 def create_consolidated_dataframe(monthly_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
@@ -16,45 +18,33 @@ def create_consolidated_dataframe(monthly_data: Dict[str, pd.DataFrame]) -> pd.D
         return pd.DataFrame()
         
     # Sort months chronologically
-    sorted_months = sorted(monthly_data.keys(), 
-                         key=lambda x: datetime.strptime(x, '%B %Y'))
+    sorted_months = sorted(monthly_data.keys(), key=month_sort_key)
     
-    # Start with the first month's data
-    consolidated_df = monthly_data[sorted_months[0]].copy()
     base_columns = ['Name of the Instrument', 'Rating / Industry^']
     
-    # Rename quantity column to include month
-    consolidated_df = consolidated_df.rename(
-        columns={
-            'Quantity': f'Quantity_{sorted_months[0]}',
-            '% to NAV': f'NAV_{sorted_months[0]}'
-        }
-    )
+    # Keep the first row per ISIN so every frame aligns one-to-one on the index
+    month_frames = []
+    for month in sorted_months:
+        month_df = monthly_data[month]
+        month_frames.append(month_df[~month_df.index.duplicated(keep='first')])
+    
+    # Instrument and industry info: first non-null value across months
+    base_df = pd.concat(
+        [month_df.reindex(columns=base_columns) for month_df in month_frames]
+    ).groupby(level=0).first()
     
-    # Merge with subsequent months
-    for month in sorted_months[1:]:
-        month_df = monthly_data[month].copy()
-        month_df = month_df.rename(
+    # Month-specific columns, renamed up front so one aligned concat builds the result
+    quantity_frames = [
+        month_df.drop(columns=base_columns, errors='ignore').rename(
             columns={
                 'Quantity': f'Quantity_{month}',
                 '% to NAV': f'NAV_{month}'
             }
         )
-        
-        consolidated_df = pd.merge(
-            consolidated_df,
-            month_df,
-            left_index=True,
-            right_index=True,
-            how='outer',
-            suffixes=('', f'_{month}')
-        )
-        
-        # Combine instrument and industry info if they differ
-        for col in base_columns:
-            if f'{col}_{month}' in consolidated_df.columns:
-                consolidated_df[col].fillna(consolidated_df[f'{col}_{month}'], inplace=True)
-                consolidated_df.drop(f'{col}_{month}', axis=1, inplace=True)
+        for month, month_df in zip(sorted_months, month_frames)
+    ]
+    
+    consolidated_df = pd.concat([base_df, *quantity_frames], axis=1, join='outer', sort=True)
     
     return consolidated_df
 
@@ -69,36 +59,36 @@ def calculate_allocation_changes(consolidated_df: pd.DataFrame) -> Tuple[pd.Data
         Tuple[pd.DataFrame, pd.DataFrame]: 
             - DataFrame with absolute changes
             - DataFrame with percentage changes
+            Each lists its change columns in attrs['change_cols'].
     """
     # Get quantity columns in chronological order
     quantity_cols = sorted(
         [col for col in consolidated_df.columns if col.startswith('Quantity_')],
-        key=lambda x: datetime.strptime(x.split('_', 1)[1], '%B %Y')
+        key=lambda x: month_sort_key(x.split('_', 1)[1])
     )
     
     if len(quantity_cols) < 2:
         return pd.DataFrame(), pd.DataFrame()
     
-    changes_abs = pd.DataFrame(index=consolidated_df.index)
-    changes_pct = pd.DataFrame(index=consolidated_df.index)
+    # Month-over-month differences over one contiguous float block
+    quantities = consolidated_df[quantity_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    previous = quantities[:, :-1]
+    abs_values = np.diff(quantities, axis=1)
+    # A zero (or missing) previous quantity has no meaningful percentage change
+    pct_values = np.divide(abs_values, previous, out=np.full_like(abs_values, np.nan),
+                           where=previous != 0) * 100
     
-    # Calculate month-over-month changes
-    for i in range(len(quantity_cols) - 1):
-        current_month = quantity_cols[i].split('_', 1)[1]
-        next_month = quantity_cols[i + 1].split('_', 1)[1]
-        
-        # Absolute change
-        change_col = f'Change_{current_month}_to_{next_month}'
-        changes_abs[change_col] = (
-            consolidated_df[quantity_cols[i + 1]] - consolidated_df[quantity_cols[i]]
-        )
-        
-        # Percentage change
-        pct_change_col = f'Pct_Change_{current_month}_to_{next_month}'
-        changes_pct[pct_change_col] = (
-            (consolidated_df[quantity_cols[i + 1]] - consolidated_df[quantity_cols[i]]) /
-            consolidated_df[quantity_cols[i]] * 100
-        )
+    months = [col.split('_', 1)[1] for col in quantity_cols]
+    transitions = [f'{current_month}_to_{next_month}'
+                   for current_month, next_month in zip(months, months[1:])]
+    change_cols = [f'Change_{t}' for t in transitions]
+    pct_change_cols = [f'Pct_Change_{t}' for t in transitions]
+    changes_abs = pd.DataFrame(abs_values, index=consolidated_df.index, columns=change_cols)
+    changes_pct = pd.DataFrame(pct_values, index=consolidated_df.index, columns=pct_change_cols)
+    
+    # Record the change columns so callers need not re-scan the column names
+    changes_abs.attrs['change_cols'] = change_cols
+    changes_pct.attrs['change_cols'] = pct_change_cols
     
     # Add instrument and industry info
     changes_abs['Name of the Instrument'] = consolidated_df['Name of the Instrument']
@@ -108,28 +98,47 @@ def calculate_allocation_changes(consolidated_df: pd.DataFrame) -> Tuple[pd.Data
     
     return changes_abs, changes_pct
 
+def get_change_columns(changes_df: pd.DataFrame,
+                       prefixes: Tuple[str, ...] = ('Change_', 'Pct_Change_')) -> List[str]:
+    """
+    Get the change columns of a DataFrame from calculate_allocation_changes.
+    
+    Args:
+        changes_df (pd.DataFrame): DataFrame with changes
+        prefixes (Tuple[str, ...]): Kinds of change column to return, e.g. ('Change_',)
+            for absolute changes only
+        
+    Returns:
+        List[str]: Change columns in chronological order (excluding Name of the
+            Instrument and Rating / Industry^)
+    """
+    change_cols = changes_df.attrs.get('change_cols')
+    if change_cols is None:
+        # Frame built elsewhere: fall back to scanning the column names
+        return [col for col in changes_df.columns if col.startswith(prefixes)]
+    # attrs survive column selection, so drop any columns no longer present
+    return [col for col in change_cols
+            if col in changes_df.columns and col.startswith(prefixes)]
+
 def get_significant_changes(changes_df: pd.DataFrame, 
-                          threshold: float = 5.0,
-                          change_type: str = 'absolute') -> pd.DataFrame:
+                          threshold: float = 5.0) -> pd.DataFrame:
     """
     Filter for significant changes in allocations.
     
+    Absolute and percentage change frames are filtered the same way.
+    
     Args:
         changes_df (pd.DataFrame): DataFrame with changes
         threshold (float): Threshold for significant changes
-        change_type (str): Type of change ('absolute' or 'percentage')
         
     Returns:
         pd.DataFrame: DataFrame with only significant changes
     """
-    # Get change columns (excluding Name of the Instrument and Rating / Industry^)
-    change_cols = [col for col in changes_df.columns 
-                  if col.startswith('Change_') or col.startswith('Pct_Change_')]
-    
-    # Create mask for significant changes
-    if change_type == 'absolute':
-        mask = changes_df[change_cols].abs().gt(threshold).any(axis=1)
-    else:  # percentage
-        mask = changes_df[change_cols].abs().gt(threshold).any(axis=1)
+    change_cols = get_change_columns(changes_df)
+    
+    # Create mask for significant changes on the raw float array
+    # (missing values never match)
+    changes = changes_df[change_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = (np.abs(changes) > threshold).any(axis=1)
     
     return changes_df[mask] 
\ No newline at end of file
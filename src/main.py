@@ -1,12 +1,23 @@
 import os
+import sys
+import logging
 from typing import List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 from user_interface import choose_fund_name_interactive, choose_date_range_interactive
-from data_loader import scan_excel_files, load_data_for_fund_months
+from data_loader import (
+    scan_excel_files,
+    load_data_for_fund_months,
+    month_sort_key,
+    resolve_month_files,
+    read_consolidated_cache,
+    write_consolidated_cache
+)
 from data_processor import (
     create_consolidated_dataframe,
     calculate_allocation_changes,
+    get_change_columns,
     get_significant_changes
 )
 from visualizations import create_all_visualizations
@@ -24,8 +35,7 @@ def get_months_in_range(start_month: str, end_month: str, available_months: List
         List[str]: List of months in range
     """
     try:
-        sorted_months = sorted(available_months, 
-                             key=lambda x: pd.to_datetime(x, format='%B %Y'))
+        sorted_months = sorted(available_months, key=month_sort_key)
         start_idx = sorted_months.index(start_month)
         end_idx = sorted_months.index(end_month)
         return sorted_months[start_idx:end_idx + 1]
@@ -34,6 +44,46 @@ def get_months_in_range(start_month: str, end_month: str, available_months: List
         print(f"Error processing dates: {e}")
         return []
 
+def format_significant_rows(changes_df: pd.DataFrame, prefix: str, threshold: float,
+                            value_format: str, as_integer: bool = False) -> List[str]:
+    """
+    Format each instrument with the periods whose change exceeds the threshold.
+    
+    Args:
+        changes_df (pd.DataFrame): DataFrame with change columns and instrument info
+        prefix (str): Prefix stripped from the change columns for period labels
+        threshold (float): Minimum absolute change to show
+        value_format (str): str.format pattern for a single change value
+        as_integer (bool): Truncate values to integers before formatting
+        
+    Returns:
+        List[str]: Output lines, without trailing newlines
+    """
+    change_cols = get_change_columns(changes_df, (prefix,))
+    periods = [col.replace(prefix, '').replace('_to_', ' to ') for col in change_cols]
+    
+    # Select and format every significant value in one pass over the array;
+    # boolean indexing returns them row by row, in column order
+    values = changes_df[change_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    shown = np.abs(values) > threshold
+    shown_values = values[shown]
+    if as_integer:
+        shown_values = shown_values.astype(np.int64)
+    texts = map(value_format.format, shown_values.tolist())
+    _, shown_cols = np.nonzero(shown)
+    details = [f"  {periods[col]}: {text}" for col, text in zip(shown_cols.tolist(), texts)]
+    
+    lines = []
+    start = 0
+    instruments = changes_df[['Name of the Instrument', 'Rating / Industry^']].itertuples(index=False, name=None)
+    for (name, industry), count in zip(instruments, shown.sum(axis=1).tolist()):
+        lines.append("")
+        lines.append(f"Instrument: {name}")
+        lines.append(f"Industry: {industry}")
+        lines.extend(details[start:start + count])
+        start += count
+    return lines
+
 def display_changes(changes_abs: pd.DataFrame, changes_pct: pd.DataFrame) -> None:
     """
     Display allocation changes in a formatted way.
@@ -48,41 +98,23 @@ def display_changes(changes_abs: pd.DataFrame, changes_pct: pd.DataFrame) -> Non
             return
         
         # Get significant changes
-        significant_abs = get_significant_changes(changes_abs, threshold=1000, change_type='absolute')
-        significant_pct = get_significant_changes(changes_pct, threshold=5.0, change_type='percentage')
+        significant_abs = get_significant_changes(changes_abs, threshold=1000)
+        significant_pct = get_significant_changes(changes_pct, threshold=5.0)
         
-        print("\nSignificant Changes in Holdings:")
-        print("=" * 80)
+        # Collect every line first and write them in one call instead of one print per line
+        lines = ["", "Significant Changes in Holdings:", "=" * 80]
         
         # Display absolute changes
         if not significant_abs.empty:
-            print("\nAbsolute Changes (>1000 units):")
-            print("-" * 40)
-            
-            for idx, row in significant_abs.iterrows():
-                print(f"\nInstrument: {row['Name of the Instrument']}")
-                print(f"Industry: {row['Rating / Industry^']}")
-                
-                for col in row.index:
-                    if col.startswith('Change_'):
-                        if pd.notna(row[col]) and abs(row[col]) > 1000:
-                            period = col.replace('Change_', '').replace('_to_', ' to ')
-                            print(f"  {period}: {int(row[col]):,} units")
+            lines += ["", "Absolute Changes (>1000 units):", "-" * 40]
+            lines += format_significant_rows(significant_abs, 'Change_', 1000, "{:,} units", as_integer=True)
         
         # Display percentage changes
         if not significant_pct.empty:
-            print("\nPercentage Changes (>5%):")
-            print("-" * 40)
-            
-            for idx, row in significant_pct.iterrows():
-                print(f"\nInstrument: {row['Name of the Instrument']}")
-                print(f"Industry: {row['Rating / Industry^']}")
-                
-                for col in row.index:
-                    if col.startswith('Pct_Change_'):
-                        if pd.notna(row[col]) and abs(row[col]) > 5:
-                            period = col.replace('Pct_Change_', '').replace('_to_', ' to ')
-                            print(f"  {period}: {row[col]:.2f}%")
+            lines += ["", "Percentage Changes (>5%):", "-" * 40]
+            lines += format_significant_rows(significant_pct, 'Pct_Change_', 5, "{:.2f}%")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
 
     except Exception as e:
         print(f"Error displaying changes: {str(e)}")
@@ -108,23 +140,32 @@ def main():
             return
         
         # Get date range from user
-        start_month, end_month = choose_date_range_interactive(fund_month_map[fund_name])
+        available_months = list(fund_month_map[fund_name])
+        start_month, end_month = choose_date_range_interactive(available_months)
         if not start_month or not end_month:
             print("Operation cancelled.")
             return
         
         # Get months in selected range
-        months = get_months_in_range(start_month, end_month, fund_month_map[fund_name])
+        months = get_months_in_range(start_month, end_month, available_months)
         
         print(f"\nLoading data for {fund_name} from {start_month} to {end_month}...")
         
-        # Load and process data
-        monthly_data = load_data_for_fund_months(fund_name, months)
-        if not monthly_data:
-            print("No data could be loaded for the selected period.")
-            return
+        # Load and process data, reusing the consolidated frame from an earlier run
+        # when none of the selected workbooks changed
+        month_files = resolve_month_files(fund_name, months, file_paths=fund_month_map[fund_name])
+        consolidated_df = read_consolidated_cache(fund_name, months, month_files)
+        if consolidated_df is None:
+            monthly_data = load_data_for_fund_months(fund_name, months, month_files=month_files)
+            if not monthly_data:
+                print("No data could be loaded for the selected period.")
+                return
+            
+            consolidated_df = create_consolidated_dataframe(monthly_data)
+            # Only cache complete selections so a missing month is retried next time
+            if len(monthly_data) == len(months):
+                write_consolidated_cache(consolidated_df, fund_name, months, month_files)
         
-        consolidated_df = create_consolidated_dataframe(monthly_data)
         changes_abs, changes_pct = calculate_allocation_changes(consolidated_df)
         
         # Display results
@@ -140,6 +181,7 @@ def main():
         return
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main() 
 
 # scan for excel 
@@ -1,8 +1,9 @@
 from typing import List, Tuple, Optional
-from datetime import datetime
-from fuzzywuzzy import process
+from rapidfuzz import fuzz, process, utils
 from dateutil.relativedelta import relativedelta
 
+from data_loader import month_sort_key
+
 def choose_fund_name_interactive(available_funds: List[str]) -> Optional[str]:
     """
     Interactive fund selection with fuzzy matching.
@@ -27,16 +28,18 @@ def choose_fund_name_interactive(available_funds: List[str]) -> Optional[str]:
         if search.lower() == 'quit':
             return None
             
-        # Use fuzzy matching to find the best matches
-        matches = process.extract(search, available_funds, limit=5)
+        # Use fuzzy matching to find the best matches; default_process applies the
+        # same lowercasing/cleanup fuzzywuzzy did before scoring
+        matches = process.extract(search, available_funds, scorer=fuzz.WRatio,
+                                  processor=utils.default_process, limit=5)
         
         if not matches:
             print("No matching funds found. Please try again.")
             continue
             
         print("\nBest matches:")
-        for i, (fund, score) in enumerate(matches, 1):
-            print(f"{i}. {fund} (match score: {score})")
+        for i, (fund, score, _) in enumerate(matches, 1):
+            print(f"{i}. {fund} (match score: {score:.0f})")
             
         choice = input("\nEnter number to select fund, or any other key to search again: ").strip()
         
@@ -58,8 +61,7 @@ def choose_date_range_interactive(available_months: List[str]) -> Tuple[Optional
         return None, None
         
     # Sort months chronologically
-    sorted_months = sorted(available_months, 
-                         key=lambda x: datetime.strptime(x, '%B %Y'))
+    sorted_months = sorted(available_months, key=month_sort_key)
     
     print("\nDate range selection options:")
     print("1. Last X months")
@@ -1,33 +1,78 @@
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Render to files only; safe to use from worker processes
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 import os
 
-def create_output_dir():
+from data_processor import get_change_columns
+
+def create_output_dir(output_dir: str = 'output'):
     """Create output directory for plots if it doesn't exist."""
-    if not os.path.exists('output'):
-        os.makedirs('output')
+    os.makedirs(output_dir, exist_ok=True)
+
+def _prepare_axes(ax: Optional[plt.Axes], figsize: Tuple[float, float]) -> Tuple[plt.Axes, bool]:
+    """
+    Get the axes to draw a chart on.
+    
+    Args:
+        ax (Optional[plt.Axes]): Axes on a reused figure, or None to create a new figure
+        figsize (Tuple[float, float]): Figure size for this chart
+        
+    Returns:
+        Tuple[plt.Axes, bool]: Axes to draw on, and whether the figure was created here
+            (and so should be closed after saving)
+    """
+    if ax is None:
+        _, ax = plt.subplots(figsize=figsize)
+        return ax, True
+    ax.figure.set_size_inches(figsize)
+    return ax, False
+
+def _save_figure(ax: plt.Axes, path: str, owns_figure: bool, **savefig_kwargs):
+    """Lay out and save the figure holding ax, closing it if it was created for this chart."""
+    fig = ax.figure
+    fig.tight_layout()
+    fig.savefig(path, **savefig_kwargs)
+    if owns_figure:
+        plt.close(fig)
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values, largest first.
+    
+    Uses a linear-time partition instead of a full sort. Ties keep their
+    original order, matching DataFrame.nlargest(keep='first').
+    """
+    if len(values) <= k:
+        return np.argsort(-values, kind='stable')
+    kth_largest = np.partition(values, len(values) - k)[len(values) - k]
+    candidates = np.flatnonzero(values >= kth_largest)
+    return candidates[np.argsort(-values[candidates], kind='stable')][:k]
 
-def plot_top_holdings_pie(df: pd.DataFrame, month: str, output_dir: str = 'output'):
+def plot_top_holdings_pie(df: pd.DataFrame, month: str, output_dir: str = 'output',
+                          ax: Optional[plt.Axes] = None):
     """
     Create a pie chart of top 10 holdings by NAV percentage for a given month.
     """
     try:
-        create_output_dir()
-        
         # Get NAV column for the month
         nav_col = f'NAV_{month}'
         if nav_col not in df.columns:
             print(f"NAV column for {month} not found")
             return
         
-        # Sort by NAV percentage and get top 10
-        top_10 = df.nlargest(10, nav_col)
+        # Get top 10 by NAV percentage with a partial sort (missing NAVs are skipped)
+        navs = df[nav_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        has_nav = np.flatnonzero(~np.isnan(navs))
+        top_10 = df.iloc[has_nav[_top_k_indices(navs[has_nav], 10)]]
         
         # Create pie chart
-        plt.figure(figsize=(12, 8))
-        wedges, texts, autotexts = plt.pie(
+        ax, owns_figure = _prepare_axes(ax, (12, 8))
+        wedges, texts, autotexts = ax.pie(
             top_10[nav_col], 
             labels=top_10['Name of the Instrument'], 
             autopct='%1.1f%%',
@@ -35,14 +80,14 @@ def plot_top_holdings_pie(df: pd.DataFrame, month: str, output_dir: str = 'outpu
         )
         
         # Enhance the appearance
-        plt.title(f'Top 10 Holdings by NAV% - {month}', pad=20)
+        ax.set_title(f'Top 10 Holdings by NAV% - {month}', pad=20)
         
         # Make labels more readable
         plt.setp(autotexts, size=8, weight="bold")
         plt.setp(texts, size=8)
         
         # Add a legend
-        plt.legend(
+        ax.legend(
             wedges, 
             top_10['Name of the Instrument'],
             title="Holdings",
@@ -51,110 +96,105 @@ def plot_top_holdings_pie(df: pd.DataFrame, month: str, output_dir: str = 'outpu
         )
         
         # Save plot
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/top_holdings_pie_{month}.png', bbox_inches='tight')
-        plt.close()
+        _save_figure(ax, os.path.join(output_dir, f'top_holdings_pie_{month}.png'), owns_figure,
+                     bbox_inches='tight')
         
     except Exception as e:
         print(f"Error creating pie chart for {month}: {str(e)}")
 
-def plot_sector_allocation(df: pd.DataFrame, month: str, output_dir: str = 'output'):
+def plot_sector_allocation(df: pd.DataFrame, month: str, output_dir: str = 'output',
+                           ax: Optional[plt.Axes] = None):
     """
     Create a bar chart showing sector-wise allocation.
     """
     try:
-        create_output_dir()
-        
         # Get NAV column for the month
         nav_col = f'NAV_{month}'
         if nav_col not in df.columns:
             print(f"NAV column for {month} not found")
             return
         
-        # Group by industry and sum NAV percentages
-        sector_allocation = df.groupby('Rating / Industry^')[nav_col].sum().sort_values()
+        # Sum NAV percentages per industry: factorize the labels once and add
+        # the weights with bincount (missing industries and NAVs are skipped)
+        codes, sectors = pd.factorize(df['Rating / Industry^'], sort=True)
+        navs = df[nav_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        has_sector = codes >= 0
+        totals = np.bincount(codes[has_sector], weights=np.nan_to_num(navs[has_sector]),
+                             minlength=len(sectors))
+        order = np.argsort(totals, kind='stable')
+        sector_allocation = pd.Series(totals[order], index=sectors[order])
         
         # Create horizontal bar chart
-        plt.figure(figsize=(12, max(8, len(sector_allocation) * 0.4)))
+        ax, owns_figure = _prepare_axes(ax, (12, max(8, len(sector_allocation) * 0.4)))
         
         # Create bars with colors
-        bars = plt.barh(range(len(sector_allocation)), sector_allocation.values)
+        bars = ax.barh(range(len(sector_allocation)), sector_allocation.values)
         
         # Customize the chart
-        plt.title(f'Sector-wise Allocation - {month}', pad=20)
-        plt.xlabel('NAV %')
-        plt.ylabel('Sector')
+        ax.set_title(f'Sector-wise Allocation - {month}', pad=20)
+        ax.set_xlabel('NAV %')
+        ax.set_ylabel('Sector')
         
         # Set y-axis ticks
-        plt.yticks(range(len(sector_allocation)), sector_allocation.index)
+        ax.set_yticks(range(len(sector_allocation)), sector_allocation.index)
         
         # Add value labels on the bars
         for i, v in enumerate(sector_allocation.values):
-            plt.text(v, i, f' {v:.2f}%', va='center')
+            ax.text(v, i, f' {v:.2f}%', va='center')
         
         # Save plot
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/sector_allocation_{month}.png')
-        plt.close()
+        _save_figure(ax, os.path.join(output_dir, f'sector_allocation_{month}.png'), owns_figure)
         
     except Exception as e:
         print(f"Error creating sector allocation chart for {month}: {str(e)}")
 
-def plot_holdings_changes_heatmap(changes_df: pd.DataFrame, output_dir: str = 'output'):
+def plot_holdings_changes_heatmap(changes_df: pd.DataFrame, output_dir: str = 'output',
+                                  ax: Optional[plt.Axes] = None):
     """
     Create a heatmap showing changes in top holdings across months.
     """
-    create_output_dir()
-    plt.figure(figsize=(15, 10))
-    
     # Get change columns
-    change_cols = [col for col in changes_df.columns if col.startswith('Change_')]
+    change_cols = get_change_columns(changes_df, ('Change_',))
     if not change_cols:
         print("No change columns found for heatmap")
         return
         
-    # Calculate total absolute change for each instrument
-    changes_df['total_change'] = abs(changes_df[change_cols]).sum(axis=1)
+    # Calculate total absolute change for each instrument (missing changes count as 0)
+    changes = changes_df[change_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    total_change = np.nansum(np.abs(changes), axis=1)
     
     # Get top 20 holdings by absolute change
-    top_20 = changes_df.nlargest(20, 'total_change')
+    top_20 = changes_df.iloc[_top_k_indices(total_change, 20)]
     
-    # Create heatmap data
-    heatmap_data = top_20[change_cols].copy()
-    heatmap_data.index = top_20['Name of the Instrument']
+    # Create heatmap data; column selection already returns a new frame
+    heatmap_data = top_20[change_cols].set_axis(top_20['Name of the Instrument'], axis=0)
     
     # Create heatmap
-    plt.figure(figsize=(12, 10))
+    ax, owns_figure = _prepare_axes(ax, (12, 10))
     sns.heatmap(heatmap_data, 
                 cmap='RdYlBu', 
                 center=0, 
                 annot=True, 
                 fmt='.0f',
-                cbar_kws={'label': 'Change in Quantity'})
+                cbar_kws={'label': 'Change in Quantity'},
+                ax=ax)
     
-    plt.title('Changes in Top 20 Holdings')
-    plt.ylabel('Instrument')
-    plt.xlabel('Period')
+    ax.set_title('Changes in Top 20 Holdings')
+    ax.set_ylabel('Instrument')
+    ax.set_xlabel('Period')
     
     # Rotate x-axis labels for better readability
-    plt.xticks(rotation=45, ha='right')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     
     # Save plot
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/holdings_changes_heatmap.png')
-    plt.close()
-    
-    # Clean up temporary column
-    if 'total_change' in changes_df.columns:
-        changes_df.drop('total_change', axis=1, inplace=True)
+    _save_figure(ax, os.path.join(output_dir, 'holdings_changes_heatmap.png'), owns_figure)
 
-def plot_nav_changes_scatter(df: pd.DataFrame, start_month: str, end_month: str, output_dir: str = 'output'):
+def plot_nav_changes_scatter(df: pd.DataFrame, start_month: str, end_month: str, output_dir: str = 'output',
+                             ax: Optional[plt.Axes] = None):
     """
     Create a scatter plot comparing NAV percentages between two months.
     """
     try:
-        create_output_dir()
-        
         start_nav = f'NAV_{start_month}'
         end_nav = f'NAV_{end_month}'
         
@@ -162,80 +202,82 @@ def plot_nav_changes_scatter(df: pd.DataFrame, start_month: str, end_month: str,
             print(f"NAV columns for comparison not found")
             return
         
-        plt.figure(figsize=(12, 8))
+        ax, owns_figure = _prepare_axes(ax, (12, 8))
         
         # Create scatter plot
-        plt.scatter(df[start_nav], df[end_nav], alpha=0.5)
+        ax.scatter(df[start_nav], df[end_nav], alpha=0.5)
         
         # Add diagonal line for reference
         max_nav = max(df[start_nav].max(), df[end_nav].max())
-        plt.plot([0, max_nav], [0, max_nav], 'r--', alpha=0.5, label='No Change Line')
+        ax.plot([0, max_nav], [0, max_nav], 'r--', alpha=0.5, label='No Change Line')
         
         # Add labels for points with significant changes
         threshold = 1.0  # NAV% change threshold
-        for idx, row in df.iterrows():
-            if abs(row[end_nav] - row[start_nav]) > threshold:
-                plt.annotate(
-                    row['Name of the Instrument'], 
-                    (row[start_nav], row[end_nav]),
-                    xytext=(5, 5), 
-                    textcoords='offset points',
-                    fontsize=8,
-                    bbox=dict(facecolor='white', edgecolor='none', alpha=0.7)
-                )
-        
-        plt.title(f'NAV% Changes: {start_month} vs {end_month}')
-        plt.xlabel(f'NAV% in {start_month}')
-        plt.ylabel(f'NAV% in {end_month}')
-        plt.legend()
+        significant = df.loc[
+            (df[end_nav] - df[start_nav]).abs() > threshold,
+            ['Name of the Instrument', start_nav, end_nav]
+        ]
+        for name, start_value, end_value in significant.itertuples(index=False, name=None):
+            ax.annotate(
+                name, 
+                (start_value, end_value),
+                xytext=(5, 5), 
+                textcoords='offset points',
+                fontsize=8,
+                bbox=dict(facecolor='white', edgecolor='none', alpha=0.7)
+            )
+        
+        ax.set_title(f'NAV% Changes: {start_month} vs {end_month}')
+        ax.set_xlabel(f'NAV% in {start_month}')
+        ax.set_ylabel(f'NAV% in {end_month}')
+        ax.legend()
         
         # Add grid
-        plt.grid(True, alpha=0.3)
+        ax.grid(True, alpha=0.3)
         
         # Save plot
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/nav_changes_scatter.png')
-        plt.close()
+        _save_figure(ax, os.path.join(output_dir, 'nav_changes_scatter.png'), owns_figure)
         
     except Exception as e:
         print(f"Error creating NAV changes scatter plot: {str(e)}")
 
-def plot_quantity_changes_waterfall(changes_df: pd.DataFrame, period: str, output_dir: str = 'output'):
+def plot_quantity_changes_waterfall(changes_df: pd.DataFrame, period: str, output_dir: str = 'output',
+                                    ax: Optional[plt.Axes] = None):
     """
     Create a waterfall chart showing top increases and decreases in holdings.
     """
     try:
-        create_output_dir()
-        
         # Get changes for the specified period
-        change_cols = [col for col in changes_df.columns if col.startswith('Change_') and period in col]
+        change_cols = [col for col in get_change_columns(changes_df, ('Change_',)) if period in col]
         if not change_cols:
             print(f"No change columns found for period {period}")
             return
             
         change_col = change_cols[0]
         
-        # Get top 5 increases and decreases
-        increases = changes_df[changes_df[change_col] > 0].nlargest(5, change_col)
-        decreases = changes_df[changes_df[change_col] < 0].nsmallest(5, change_col)
-        
-        # Combine data
-        changes = pd.concat([increases, decreases])
+        # Get top 5 increases and decreases as row positions, then take all rows at once
+        values = changes_df[change_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        increases = np.flatnonzero(values > 0)
+        decreases = np.flatnonzero(values < 0)
+        changes = changes_df.iloc[np.concatenate([
+            increases[_top_k_indices(values[increases], 5)],
+            decreases[_top_k_indices(-values[decreases], 5)]
+        ])]
         
         # Create figure
-        plt.figure(figsize=(15, 8))
+        ax, owns_figure = _prepare_axes(ax, (15, 8))
         
         # Create bars with different colors for increases and decreases
-        bars = plt.bar(range(len(changes)), 
+        bars = ax.bar(range(len(changes)), 
                       changes[change_col],
                       color=['g' if x > 0 else 'r' for x in changes[change_col]])
         
         # Customize the chart
-        plt.title(f'Top Holdings Changes - {period}')
-        plt.ylabel('Change in Quantity')
+        ax.set_title(f'Top Holdings Changes - {period}')
+        ax.set_ylabel('Change in Quantity')
         
         # Set x-axis labels
-        plt.xticks(
+        ax.set_xticks(
             range(len(changes)),
             changes['Name of the Instrument'],
             rotation=45,
@@ -244,7 +286,7 @@ def plot_quantity_changes_waterfall(changes_df: pd.DataFrame, period: str, outpu
         
         # Add value labels
         for i, v in enumerate(changes[change_col]):
-            plt.text(
+            ax.text(
                 i, v,
                 f'{int(v):,}',
                 ha='center',
@@ -253,43 +295,82 @@ def plot_quantity_changes_waterfall(changes_df: pd.DataFrame, period: str, outpu
             )
         
         # Add grid
-        plt.grid(True, axis='y', alpha=0.3)
+        ax.grid(True, axis='y', alpha=0.3)
         
         # Save plot
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/quantity_changes_waterfall_{period}.png')
-        plt.close()
+        _save_figure(ax, os.path.join(output_dir, f'quantity_changes_waterfall_{period}.png'), owns_figure)
         
     except Exception as e:
         print(f"Error creating quantity changes waterfall chart: {str(e)}")
 
+# Figure reused by every chart rendered in a worker process (see _init_chart_worker)
+_worker_figure: Optional[plt.Figure] = None
+
+def _init_chart_worker():
+    """Create the figure this worker process draws all of its charts on."""
+    global _worker_figure
+    _worker_figure = plt.figure()
+
+def _render_chart(plot_func: Callable, *args):
+    """
+    Draw one chart on the worker's reused figure.
+    
+    Args:
+        plot_func (Callable): One of the plot_* functions
+        *args: Positional arguments for plot_func
+    """
+    # Clearing the whole figure also drops extra axes such as the heatmap colorbar
+    _worker_figure.clf()
+    plot_func(*args, ax=_worker_figure.add_subplot())
+
+def _select_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Slice df down to the listed columns that exist, so workers receive only what they plot."""
+    # A single-month selection lists the same NAV column twice; keep it once
+    columns = list(dict.fromkeys(columns))
+    return df[[col for col in columns if col in df.columns]]
+
 def create_all_visualizations(consolidated_df: pd.DataFrame, 
                             changes_df: pd.DataFrame,
                             months: list,
                             output_dir: str = 'output'):
     try:
-        # Create pie charts and sector allocation charts for each month
-        for month in months:
-            print(f"Creating charts for {month}...")
-            plot_top_holdings_pie(consolidated_df, month)
-            plot_sector_allocation(consolidated_df, month)
+        create_output_dir(output_dir)
         
-        # Create changes heatmap
-        print("Creating holdings changes heatmap...")
-        plot_holdings_changes_heatmap(changes_df)
-        
-        # Create NAV changes scatter plot
-        print("Creating NAV changes scatter plot...")
-        plot_nav_changes_scatter(consolidated_df, months[0], months[-1])
-        
-        # Create quantity changes waterfall chart
-        print("Creating quantity changes waterfall chart...")
+        name_col = 'Name of the Instrument'
+        change_cols = get_change_columns(changes_df, ('Change_',))
         period = f"{months[0]}_to_{months[-1]}"
-        plot_quantity_changes_waterfall(changes_df, period)
+        
+        # Every chart is independent and writes its own file, so render them in
+        # separate processes; each task carries only the columns its chart uses
+        tasks = []
+        for month in months:
+            nav_col = f'NAV_{month}'
+            tasks.append((f"Creating charts for {month}...", plot_top_holdings_pie,
+                          _select_columns(consolidated_df, [name_col, nav_col]), month, output_dir))
+            tasks.append((None, plot_sector_allocation,
+                          _select_columns(consolidated_df, ['Rating / Industry^', nav_col]), month, output_dir))
+        tasks.append(("Creating holdings changes heatmap...", plot_holdings_changes_heatmap,
+                      _select_columns(changes_df, [name_col, *change_cols]), output_dir))
+        tasks.append(("Creating NAV changes scatter plot...", plot_nav_changes_scatter,
+                      _select_columns(consolidated_df, [name_col, f'NAV_{months[0]}', f'NAV_{months[-1]}']),
+                      months[0], months[-1], output_dir))
+        tasks.append(("Creating quantity changes waterfall chart...", plot_quantity_changes_waterfall,
+                      _select_columns(changes_df, [name_col, *[col for col in change_cols if period in col]]),
+                      period, output_dir))
+        
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_chart_worker) as executor:
+            futures = []
+            for message, plot_func, *args in tasks:
+                if message:
+                    print(message)
+                futures.append(executor.submit(_render_chart, plot_func, *args))
+            for future in futures:
+                future.result()
         
         print(f"\nVisualizations have been saved to the '{output_dir}' directory:")
         
     except Exception as e:
         print(f"Error in visualization creation: {str(e)}")
         import traceback
-        print(traceback.format_exc()) 
\ No newline at end of file
+        print(traceback.format_exc())